@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+
+import unittest
+import pybeeb.Emulation
+from pybeeb.Emulation import PbConstants
+
+
+class MockHook(object):
+    def __init__(self, begin, end):
+        self.address = begin
+        self.end = end
+        self.size = end - begin
+
+
+class HookRangesTests(unittest.TestCase):
+    def setUp(self):
+        self.ranges = pybeeb.Emulation.PbHookRanges()
+
+    def test_empty(self):
+        self.assertEqual(self.ranges.overlapping(0x1000, 0x100), [])
+
+    def test_inside(self):
+        hook = MockHook(0x1010, 0x1020)
+        self.ranges.add(hook)
+        self.assertEqual(self.ranges.overlapping(0x1000, 0x100), [hook])
+
+    def test_startsBefore(self):
+        hook = MockHook(0x800, 0x1001)
+        self.ranges.add(hook)
+        self.assertEqual(self.ranges.overlapping(0x1000, 0x100), [hook])
+
+    def test_endsBefore(self):
+        self.ranges.add(MockHook(0x800, 0x1000))
+        self.assertEqual(self.ranges.overlapping(0x1000, 0x100), [])
+
+    def test_touchesEnd(self):
+        self.ranges.add(MockHook(0x1100, 0x1101))
+        self.assertEqual(self.ranges.overlapping(0x1000, 0x100), [])
+
+    def test_lastByte(self):
+        hook = MockHook(0x10FF, 0x1100)
+        self.ranges.add(hook)
+        self.assertEqual(self.ranges.overlapping(0x1000, 0x100), [hook])
+
+    def test_addressOrder(self):
+        hooks = [MockHook(0x1080, 0x1081), MockHook(0x900, 0x1010), MockHook(0x1000, 0x1001)]
+        for hook in hooks:
+            self.ranges.add(hook)
+        self.assertEqual(self.ranges.overlapping(0x1000, 0x100), [hooks[1], hooks[2], hooks[0]])
+
+    def test_remove(self):
+        long_hook = MockHook(0x100, 0x1080)
+        short_hook = MockHook(0xFF0, 0x1008)
+        self.ranges.add(long_hook)
+        self.ranges.add(short_hook)
+        self.assertEqual(self.ranges.overlapping(0x1000, 0x100), [long_hook, short_hook])
+
+        self.ranges.remove(long_hook)
+        self.assertEqual(self.ranges.longest, 0x18)
+        self.assertEqual(self.ranges.overlapping(0x1000, 0x100), [short_hook])
+
+        self.ranges.remove(short_hook)
+        self.assertEqual(self.ranges.longest, 0)
+        self.assertEqual(self.ranges.overlapping(0x1000, 0x100), [])
+
+
+class BlockHookTests(unittest.TestCase):
+    def setUp(self):
+        self.pb = pybeeb.Emulation.Pb()
+        self.calls = []
+
+    def record(self, pb, access, address, size, value, user_data):
+        self.calls.append((access, address, size, value))
+
+    def test_readBytes(self):
+        self.pb.hook_add(PbConstants.PB_HOOK_MEM_READ, self.record, begin=0x2010, end=0x2020)
+        self.pb.memory.readBytes(0x2000, 0x18)
+        self.assertEqual(self.calls, [(PbConstants.PB_MEM_READ, 0x2010, 8, 0)])
+
+    def test_writeBytes(self):
+        self.pb.hook_add(PbConstants.PB_HOOK_MEM_WRITE, self.record, begin=0x2010, end=0x2020)
+        self.pb.memory.writeBytes(0x2018, bytearray(range(0x10)))
+        self.assertEqual(self.calls, [(PbConstants.PB_MEM_WRITE, 0x2018, 8, bytearray(range(8)))])
+
+    def test_writeBytesOutsideHook(self):
+        self.pb.hook_add(PbConstants.PB_HOOK_MEM_WRITE, self.record, begin=0x2010, end=0x2020)
+        self.pb.memory.writeBytes(0x2020, bytearray(0x10))
+        self.assertEqual(self.calls, [])
+
+    def test_writeBytesAfterRemove(self):
+        hook = self.pb.hook_add(PbConstants.PB_HOOK_MEM_WRITE, self.record, begin=0x2010, end=0x2020)
+        self.pb.hook_del(hook)
+        self.pb.memory.writeBytes(0x2000, bytearray(0x20))
+        self.assertEqual(self.calls, [])
+
+
+class RegisterTests(unittest.TestCase):
+    def setUp(self):
+        self.pb = pybeeb.Emulation.Pb()
+
+    def test_readWrite(self):
+        self.pb.reg_write(PbConstants.PB_6502_REG_X, 0x123)
+        self.assertEqual(self.pb.reg_read(PbConstants.PB_6502_REG_X), 0x23)
+
+    def test_invalid(self):
+        for reg_id in (-1, PbConstants.PB_6502_REG_INVALID, PbConstants.PB_6502_REG_PS + 1, None):
+            self.assertRaises(pybeeb.Emulation.PbError, self.pb.reg_read, reg_id)
+            self.assertRaises(pybeeb.Emulation.PbError, self.pb.reg_write, reg_id, 0)
+
+
+def main():
+    unittest.main(module=__name__)
+
+
+if __name__ == '__main__':
+    main()
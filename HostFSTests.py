@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import pybeeb.Host.fsbbc as fsbbc
+import pybeeb.Host.hostfs as hostfs
+
+
+class HostFSTestCase(unittest.TestCase):
+    def setUp(self):
+        self.basedir = tempfile.mkdtemp()
+        self.fs = fsbbc.FS(self.basedir)
+        self.osbget = hostfs.OSBGEThost(self.fs)
+        self.osbput = hostfs.OSBPUThost(self.fs)
+
+    def tearDown(self):
+        shutil.rmtree(self.basedir)
+
+    def createFile(self, name, data):
+        with open(os.path.join(self.basedir, name), 'wb') as fh:
+            fh.write(data)
+
+    def fileData(self, name):
+        # The host file may have an extension for its type, so find it through the filesystem
+        with open(self.fs.find(name).fullpath_native, 'rb') as fh:
+            return fh.read()
+
+    def bget(self, handle):
+        return self.osbget.osbget(handle, None)
+
+    def bput(self, handle, b):
+        self.osbput.osbput(b, handle, None)
+
+
+class OpenFileTests(HostFSTestCase):
+    def test_bputExtent(self):
+        handle = self.fs.open(b'data', fsbbc.open_out)
+        for index in range(300):
+            self.bput(handle, index & 0xFF)
+        self.assertEqual(self.fs.ext_read(handle), 300)
+        self.assertEqual(self.fs.ptr_read(handle), 300)
+        self.assertTrue(self.fs.eof(handle))
+        self.fs.close(handle)
+        self.assertEqual(self.fileData(b'data'), bytearray(index & 0xFF for index in range(300)))
+
+    def test_bgetReadahead(self):
+        self.createFile('data', bytearray(300))
+        handle = self.fs.open(b'data', fsbbc.open_in)
+        for index in range(10):
+            self.assertEqual(self.bget(handle), 0)
+        # The whole file has been read ahead, but the pointer is where the reader is
+        self.assertEqual(self.fs.ptr_read(handle), 10)
+        self.assertEqual(self.fs.ext_read(handle), 300)
+        self.assertFalse(self.fs.eof(handle))
+        self.fs.close(handle)
+
+    def test_eofLoop(self):
+        self.createFile('data', bytearray(300))
+        handle = self.fs.open(b'data', fsbbc.open_in)
+        count = 0
+        while not self.fs.eof(handle):
+            self.bget(handle)
+            count += 1
+        self.assertEqual(count, 300)
+        self.assertEqual(self.bget(handle), -1)
+        self.fs.close(handle)
+
+    def test_bputAfterReadahead(self):
+        self.createFile('data', bytearray(300))
+        handle = self.fs.open(b'data', fsbbc.open_up)
+        for index in range(10):
+            self.bget(handle)
+        # The byte is written where the reader is, not after the data read ahead
+        self.bput(handle, 0x41)
+        self.assertEqual(self.fs.ptr_read(handle), 11)
+        self.assertEqual(self.fs.ext_read(handle), 300)
+        self.assertFalse(self.fs.eof(handle))
+        self.assertEqual(self.bget(handle), 0)
+        self.assertEqual(self.fs.ptr_read(handle), 12)
+
+        # Writing at the end extends the file
+        self.fs.ptr_write(handle, 300)
+        self.bput(handle, 0x42)
+        self.assertEqual(self.fs.ptr_read(handle), 301)
+        self.assertEqual(self.fs.ext_read(handle), 301)
+        self.assertTrue(self.fs.eof(handle))
+        self.fs.close(handle)
+
+        data = self.fileData(b'data')
+        self.assertEqual(len(data), 301)
+        self.assertEqual(data[10:12], b'A\0')
+        self.assertEqual(data[300:], b'B')
+
+    def test_openupKeepsData(self):
+        self.createFile('data', b'hello world')
+        handle = self.fs.open(b'data', fsbbc.open_up)
+        self.assertEqual(self.fs.ext_read(handle), 11)
+        self.assertEqual(self.bget(handle), ord('h'))
+        self.fs.close(handle)
+        self.assertEqual(self.fileData(b'data'), b'hello world')
+
+    def test_openupWrite(self):
+        self.createFile('data', b'hello world')
+        handle = self.fs.open(b'data', fsbbc.open_up)
+        self.bput(handle, ord('j'))
+        self.fs.close(handle)
+        self.assertEqual(self.fileData(b'data'), b'jello world')
+
+
+class CatalogueTests(HostFSTestCase):
+    def test_fileinfoAfterWrite(self):
+        self.createFile('data', b'hello')
+        self.assertEqual(self.fs.fileinfo(b'data').length, 5)
+        handle = self.fs.open(b'data', fsbbc.open_out)
+        for b in bytearray(b'hello world'):
+            self.bput(handle, b)
+        self.fs.close(handle)
+        self.assertEqual(self.fs.fileinfo(b'data').length, 11)
+
+    def test_fileinfoAfterSave(self):
+        self.fs.save_stream(b'data', b'hello', 0x1900, 0x1902)
+        info = self.fs.fileinfo(b'data')
+        self.assertEqual((info.type, info.load, info.exec_, info.length), (1, 0x1900, 0x1902, 5))
+
+        self.fs.save_stream(b'data', b'hello world', 0x2000, 0x2002)
+        info = self.fs.fileinfo(b'data')
+        self.assertEqual((info.type, info.load, info.exec_, info.length), (1, 0x2000, 0x2002, 11))
+
+    def test_fileinfoAfterRename(self):
+        self.createFile('data', b'hello')
+        self.assertEqual(self.fs.fileinfo(b'data').load, 0)
+        # Changing the load and exec addresses may rename the host file
+        self.fs.update_fileinfo(b'data', loadaddr=0xFFFF0E00, execaddr=0xFFFF8023)
+        info = self.fs.fileinfo(b'data')
+        self.assertEqual((info.load, info.exec_, info.length), (0xFFFF0E00, 0xFFFF8023, 5))
+        self.assertEqual(self.fileData(b'data'), b'hello')
+
+    def test_missingThenCreated(self):
+        self.assertRaises(fsbbc.BBCFileNotFoundError, self.fs.fileinfo, b'data')
+        self.assertRaises(fsbbc.BBCFileNotFoundError, self.fs.open, b'data', fsbbc.open_in)
+
+        handle = self.fs.open(b'data', fsbbc.open_out)
+        self.fs.close(handle)
+        self.assertEqual(self.fs.fileinfo(b'data').length, 0)
+        handle = self.fs.open(b'data', fsbbc.open_in)
+        self.assertEqual(self.bget(handle), -1)
+        self.fs.close(handle)
+
+    def test_createdOnHost(self):
+        self.assertRaises(fsbbc.BBCFileNotFoundError, self.fs.fileinfo, b'data')
+        self.createFile('data', b'hello')
+        # Ensure that the directory appears modified, whatever the timestamp resolution
+        stat = os.stat(self.basedir)
+        os.utime(self.basedir, (stat.st_atime, stat.st_mtime + 10))
+
+        self.fs.dir(validate=True)
+        self.assertEqual(self.fs.fileinfo(b'data').length, 5)
+
+
+def main():
+    unittest.main(module=__name__)
+
+
+if __name__ == '__main__':
+    main()
@@ -2,6 +2,7 @@
 
 import unittest
 import pybeeb.CPU.Memory
+import pybeeb.ArrayMemMapper
 
 
 class MockMapper(object):
@@ -105,6 +106,46 @@ class OverlaidMappingTests(unittest.TestCase):
             self.assertEqual(self.secondMapper.lastByteWritten, (address - 0x100, (address & 0xff) ^ 0xff))
 
 
+class BlockMappingTests(unittest.TestCase):
+    def setUp(self):
+        self.mem = pybeeb.CPU.Memory.Memory()
+        self.mapped = bytearray(0x100)
+        # Note: the end of the map is inclusive
+        self.mem.map((0x100, 0x1FF), pybeeb.ArrayMemMapper.Mapper(self.mapped))
+
+    def test_readIntoMap(self):
+        self.mem.memory[0xF0:0x100] = bytearray(range(1, 0x11))
+        self.mapped[0:0x10] = bytearray(range(0x11, 0x21))
+        self.assertEqual(self.mem.readBytes(0xF0, 0x20), bytearray(range(1, 0x21)))
+
+    def test_readOutOfMap(self):
+        self.mapped[0xF0:0x100] = bytearray(range(1, 0x11))
+        self.mem.memory[0x200:0x210] = bytearray(range(0x11, 0x21))
+        self.assertEqual(self.mem.readBytes(0x1F0, 0x20), bytearray(range(1, 0x21)))
+
+    def test_readAcrossMap(self):
+        self.mem.memory[0xFF] = 1
+        self.mapped[:] = bytearray([2] * 0x100)
+        self.mem.memory[0x200] = 3
+        self.assertEqual(self.mem.readBytes(0xFF, 0x102), bytearray([1] + [2] * 0x100 + [3]))
+
+    def test_writeIntoMap(self):
+        self.mem.writeBytes(0xF0, bytearray(range(1, 0x21)))
+        self.assertEqual(self.mem.memory[0xF0:0x100], bytearray(range(1, 0x11)))
+        self.assertEqual(self.mapped[0:0x10], bytearray(range(0x11, 0x21)))
+
+    def test_writeOutOfMap(self):
+        self.mem.writeBytes(0x1F0, bytearray(range(1, 0x21)))
+        self.assertEqual(self.mapped[0xF0:0x100], bytearray(range(1, 0x11)))
+        self.assertEqual(self.mem.memory[0x200:0x210], bytearray(range(0x11, 0x21)))
+
+    def test_writeAcrossMap(self):
+        self.mem.writeBytes(0xFF, bytearray([1] + [2] * 0x100 + [3]))
+        self.assertEqual(self.mem.memory[0xFF], 1)
+        self.assertEqual(self.mapped, bytearray([2] * 0x100))
+        self.assertEqual(self.mem.memory[0x200], 3)
+
+
 def main():
     unittest.main(module=__name__)
 
@@ -10,7 +10,7 @@ import sys
 
 from pybeeb.Emulation import Pb, PbError, PbConstants
 from pybeeb.Host import (BBCError, InputEOFError, OSInterface,
-                         OSCLI, OSBYTE, OSFILE, OSFIND, OSARGS, OSBPUT, OSBGET, OSGBPB, OSFSC)
+                         OSCLI, OSBYTE, OSWRCH, OSFILE, OSFIND, OSARGS, OSBPUT, OSBGET, OSGBPB, OSFSC)
 from pybeeb.Host.hosttty import OSWRCHtty, OSRDCHtty, OSWORDtty, OSBYTEtty
 from pybeeb.Host.hostfs import host_fs_interfaces
 
@@ -96,6 +96,9 @@ def main():
             interface = cls()
             interface.start()
             interfaces.append(interface)
+            if isinstance(interface, OSWRCH):
+                # Output from Python can be written to this interface directly
+                bbc.pb.mos.oswrch_interface = interface
             def hook(pb, address, size, user_data, interface=interface):
                 try:
                     #print("Call interface %r" % (interface,))
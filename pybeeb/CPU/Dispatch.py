@@ -109,13 +109,25 @@ class Dispatcher(object):
                                 "NW" : writebackDispatcher.NW
                                 }
 
+        # The handlers for each opcode are looked up once, into a table indexed by the
+        # opcode, so that executing an instruction doesn't need to decode its names.
+        # Each entry is (instruction, writeback, length, data, address, execute, writeback function).
+        self.opcodeTable = []
+        for opcode in range(256):
+            addressingMode = decoder.addressingMode(opcode)
+            instruction = decoder.instruction(opcode)
+            writeback = decoder.writeback(opcode)
+            self.opcodeTable.append((instruction, writeback, decoder.instructionLength(opcode),
+                                     self.dataTable[addressingMode],
+                                     self.addressTable[addressingMode],
+                                     self.executionTable[instruction],
+                                     self.writebackTable[writeback]))
+
     def dataDecode(self, opcode):
-        addressingMode = self.decoder.addressingMode(opcode)
-        return self.dataTable[addressingMode]()
+        return self.opcodeTable[opcode][3]()
 
     def addressDecode(self, opcode):
-        addressingMode = self.decoder.addressingMode(opcode)
-        return self.addressTable[addressingMode]()
+        return self.opcodeTable[opcode][4]()
 
     def decode(self, pc):
         """
@@ -124,9 +136,8 @@ class Dispatcher(object):
         @return: Tuple of the (opcode value, instruction name, writeback type, instruction length)
         """
         opcode = self.memory.readByte(self.registers.pc)
-        instruction = self.decoder.instruction(opcode)
-        writeback = self.decoder.writeback(opcode)
-        return (opcode, instruction, writeback, self.decoder.instructionLength(opcode))
+        entry = self.opcodeTable[opcode]
+        return (opcode, entry[0], entry[1], entry[2])
 
     def execute(self, pc, length, opcode, instruction, writeback):
         """
@@ -140,24 +151,28 @@ class Dispatcher(object):
 
         @return:    value which was written
         """
-        data = self.dataDecode(opcode)
-        address = self.addressDecode(opcode)
-        result = self.executionTable[instruction](data, address)
+        entry = self.opcodeTable[opcode]
+        data = entry[3]()
+        address = entry[4]()
+        result = entry[5](data, address)
 
         if result != None:
-            self.writebackTable[writeback](result, address)
+            entry[6](result, address)
 
         self.registers.pc = self.registers.nextPC
         return result
 
     def dispatch(self):
-        # Decode
-        pc = self.registers.pc
-        (opcode, instruction, writeback, length) = self.decode(pc)
-        self.registers.nextPC = pc + length
+        # Decode (as decode(), but without building the decoded tuple)
+        registers = self.registers
+        pc = registers.pc
+        opcode = self.memory.readByte(pc)
+        entry = self.opcodeTable[opcode]
+        length = entry[2]
+        registers.nextPC = pc + length
 
         # Execute
-        result = self.execute(pc, length, opcode, instruction, writeback)
+        result = self.execute(pc, length, opcode, entry[0], entry[1])
 
         return result
 
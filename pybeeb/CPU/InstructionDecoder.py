@@ -1,3 +1,24 @@
+# Addressing modes, numbered so that they may be used to index dispatch tables
+MODE_IMP = 0
+MODE_ACC = 1
+MODE_IMM = 2
+MODE_ZP = 3
+MODE_ZPX = 4
+MODE_ZPY = 5
+MODE_REL = 6
+MODE_ABS = 7
+MODE_ABX = 8
+MODE_ABY = 9
+MODE_IND = 10
+MODE_INX = 11
+MODE_INY = 12
+
+# Addressing mode names, as used in the decode table, in mode number order
+ADDRESSING_MODES = ("imp", "acc", "imm", "zp", "zpx", "zpy", "rel",
+                    "abs", "abx", "aby", "ind", "inx", "iny")
+MODE_NUMBERS = dict((name, number) for (number, name) in enumerate(ADDRESSING_MODES))
+
+
 class Decoder(object):
     def __init__(self, decodeFilename):
         decodeFile = open(decodeFilename)
@@ -9,9 +30,10 @@ class Decoder(object):
             (opcode, instr, addr, wb, byteLen, time) = entry.split(",")
             try:
                 if instr != "":
-                    self.decodeTable[int(opcode,16)] = (instr, addr, wb, int(byteLen), int(time))
+                    self.decodeTable[int(opcode,16)] = (instr, addr, wb, int(byteLen), int(time),
+                                                        MODE_NUMBERS[addr])
                 else:
-                    self.decodeTable[int(opcode,16)] = ("UNDEFINED", "imp", "NW", 1, 1)
+                    self.decodeTable[int(opcode,16)] = ("UNDEFINED", "imp", "NW", 1, 1, MODE_IMP)
             except ValueError:
                 pass
 
@@ -21,6 +43,9 @@ class Decoder(object):
     def addressingMode(self, opcode):
         return self.decodeTable[opcode][1]
 
+    def addressingModeNumber(self, opcode):
+        return self.decodeTable[opcode][5]
+
     def writeback(self, opcode):
         return self.decodeTable[opcode][2]
 
@@ -19,6 +19,17 @@ class ValueOutOfRange(Exception):
     def __repr__(self):
         return "Value out of range: %s" % hex(self.value)
 
+def readOnlyView(data):
+    """
+    Obtain a memoryview of some data, which is read-only where the Python version
+    supports it (3.8 onwards).
+    """
+    view = memoryview(data)
+    if hasattr(view, 'toreadonly'):
+        view = view.toreadonly()
+    return view
+
+
 class Memory(object):
     class Map(object):
         def __init__(self, range, callback):
@@ -111,19 +122,23 @@ class Memory(object):
         """
         Read multiple bytes into a bytearray / mapped region.
         """
-        if address < 0:
-            raise InvalidAddressException(address)
+        # Addresses wrap within the 16 bit address space
+        address &= 0xFFFF
         if address + size > 0xffff:
             raise InvalidAddressException(address + size)
 
+        if self.isUnmapped(address, size):
+            # Ordinary memory can be copied in one go
+            return self.memory[address:address + size]
+
         data = bytearray()
 
         while size:
             map = self.getMapFor(address)
             if map:
                 end = address + size
-                if end > map.end():
-                    end = map.end()
+                if end > map.end() + 1:
+                    end = map.end() + 1
                 mappedDevice = map.callback
                 base = map.base()
                 map_data = bytearray([mappedDevice.readByte(offset) for offset in range(address - base, end - base)])
@@ -150,29 +165,83 @@ class Memory(object):
 
         return data
 
+    def getView(self, address, size):
+        """
+        Obtain a view of a region of memory, for reading.
+
+        If the region is ordinary memory, the view refers directly to it, without
+        copying. If any part of the region is mapped, the view is of a copy of the
+        data read through the mapping. The view is read-only on Python 3.8 and later;
+        on earlier versions it must not be written to.
+        """
+        # Addresses wrap within the 16 bit address space
+        address &= 0xFFFF
+        if address + size > 0xffff:
+            raise InvalidAddressException(address + size)
+
+        if self.isUnmapped(address, size):
+            return readOnlyView(self.memory)[address:address + size]
+
+        return readOnlyView(self.readBytes(address, size))
+
+    def getWritableView(self, address, size):
+        """
+        Obtain a writable view of a region of memory.
+
+        Data written to the view is stored directly in memory, so this is only
+        possible if the region is ordinary memory.
+
+        @return: memoryview of the region, or None if any part of it is mapped
+        """
+        # Addresses wrap within the 16 bit address space
+        address &= 0xFFFF
+        if address + size > 0xffff:
+            raise InvalidAddressException(address + size)
+
+        if self.isUnmapped(address, size):
+            return memoryview(self.memory)[address:address + size]
+        return None
+
+    def isUnmapped(self, address, size):
+        """
+        Check whether a region is entirely ordinary memory.
+        """
+        if self.getMapFor(address) is not None:
+            return False
+        map = self.getNextMap(address)
+        return not map or map.base() >= address + size
+
     def writeBytes(self, address, value):
         """
         Read multiple bytes into a bytearray / mapped region.
         """
         size = len(value)
-        if not isinstance(value, bytearray):
-            value = bytearray(value)
 
-        if address < 0:
-            raise InvalidAddressException(address)
+        # Addresses wrap within the 16 bit address space
+        address &= 0xFFFF
         if address + size > 0xffff:
             raise InvalidAddressException(address + size)
 
+        if self.isUnmapped(address, size):
+            # Ordinary memory can be written in one go
+            self.memory[address:address + size] = value
+            return
+
+        if not isinstance(value, bytearray):
+            value = bytearray(value)
+
+        # Offset within the value of the data to write at address
+        offset = 0
         while size:
             map = self.getMapFor(address)
             if map:
                 end = address + size
-                if end > map.end():
-                    end = map.end()
+                if end > map.end() + 1:
+                    end = map.end() + 1
                 mappedDevice = map.callback
                 base = map.base()
                 for index in range(end - address):
-                    mappedDevice.writeByte(address + index - base, value[index])
+                    mappedDevice.writeByte(address + index - base, value[offset + index])
             else:
                 # No mapping region, so this is a regular byte array,
                 # and we need to find out how far it extends.
@@ -187,9 +256,9 @@ class Memory(object):
                 if end > next_start:
                     end = next_start
 
-                self.memory[address:end] = value[:end - address]
+                self.memory[address:end] = value[offset:offset + end - address]
 
-            value = value[end - address:]
+            offset += (end - address)
             size -= (end - address)
             address = end
 
@@ -202,6 +271,10 @@ class Memory(object):
     def readWord(self, address):
         return self.readByte(address) + (self.readByte(address + 1) << 8)
 
+    def writeWord(self, address, value):
+        self.writeByte(address, value & 0xFF)
+        self.writeByte(address + 1, (value >> 8) & 0xFF)
+
     def readLongWord(self, address):
         parts = self.readBytes(address, 4)
         return parts[0] | (parts[1]<<8) | (parts[2]<<16) | (parts[3]<<24)
@@ -102,6 +102,25 @@ class RegisterBank(object):
         self.overflow = old.overflow
         self.negative = old.negative
 
+    def exchange(self, other):
+        """
+        Exchange the state with that of another register bank.
+        """
+        (self.pc, other.pc) = (other.pc, self.pc)
+        (self.sp, other.sp) = (other.sp, self.sp)
+        (self.a, other.a) = (other.a, self.a)
+        (self.x, other.x) = (other.x, self.x)
+        (self.y, other.y) = (other.y, self.y)
+        (self.nextPC, other.nextPC) = (other.nextPC, self.nextPC)
+
+        (self.carry, other.carry) = (other.carry, self.carry)
+        (self.zero, other.zero) = (other.zero, self.zero)
+        (self.int, other.int) = (other.int, self.int)
+        (self.dec, other.dec) = (other.dec, self.dec)
+        (self.brk, other.brk) = (other.brk, self.brk)
+        (self.overflow, other.overflow) = (other.overflow, self.overflow)
+        (self.negative, other.negative) = (other.negative, self.negative)
+
     def status(self):
         sys.stdout.write("%s%s.%s%s%s%s%s" % (
                                               "N" if self.negative else "-",
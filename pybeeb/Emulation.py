@@ -5,6 +5,8 @@ Allows code that was written for Unicorn to work with PyBeeb with minimal
 modifications (or just remapping the variable names).
 """
 
+import bisect
+import numbers
 import os.path
 
 from .CPU import Memory
@@ -64,25 +66,34 @@ def pb_version():
     return (major, minor, combined)
 
 
+# BBC-style hexadecimal for each byte value, for formatting operands
+_HEX_BYTE_TABLE = tuple('&%02X' % (b,) for b in range(256))
+
+
 class Dissassemble6502(object):
 
     def __init__(self, decoder):
         self.decoder = decoder
-        self.disassembly_table = {
-                "imp": self.operands_imp,
-                "acc": self.operands_acc,
-                "imm": self.operands_imm,
-                "zp" : self.operands_zp,
-                "zpx": self.operands_zpx,
-                "zpy": self.operands_zpy,
-                "rel": self.operands_rel,
-                "abs": self.operands_abs,
-                "abx": self.operands_abx,
-                "aby": self.operands_aby,
-                "ind": self.operands_ind,
-                "inx": self.operands_inx,
-                "iny": self.operands_iny,
-           }
+        # The operand disassembly functions, indexed by addressing mode number
+        self.disassembly_table = (
+                self.operands_imp,
+                self.operands_acc,
+                self.operands_imm,
+                self.operands_zp,
+                self.operands_zpx,
+                self.operands_zpy,
+                self.operands_rel,
+                self.operands_abs,
+                self.operands_abx,
+                self.operands_aby,
+                self.operands_ind,
+                self.operands_inx,
+                self.operands_iny,
+           )
+        # The instruction name and operand disassembly function for each opcode
+        self.opcode_table = tuple((decoder.instruction(opcode),
+                                   self.disassembly_table[decoder.addressingModeNumber(opcode)])
+                                  for opcode in range(256))
 
     def operands_imp(self, pc):
         return ("", '')
@@ -92,19 +103,19 @@ class Dissassemble6502(object):
 
     def operands_imm(self, pc):
         b = self.read_byte(pc + 1)
-        return ("#%s" % (b,), "= &%02X" % (b,) if b > 10 else '')
+        return ("#%s" % (b,), "= " + _HEX_BYTE_TABLE[b] if b > 10 else '')
 
     def operands_zp(self, pc):
         b = self.read_byte(pc + 1)
-        return ("&%02X" % (b,), '')
+        return (_HEX_BYTE_TABLE[b], '')
 
     def operands_zpx(self, pc):
         b = self.read_byte(pc + 1)
-        return ("&%02X, X" % (b,), "-> &%02X" % (b + self.reg_x(),))
+        return (_HEX_BYTE_TABLE[b] + ", X", "-> &%02X" % (b + self.reg_x(),))
 
     def operands_zpy(self, pc):
         b = self.read_byte(pc + 1)
-        return ("&%02X, Y" % (b,), "-> &%02X" % (b + self.reg_y(),))
+        return (_HEX_BYTE_TABLE[b] + ", Y", "-> &%02X" % (b + self.reg_y(),))
 
     def operands_rel(self, pc):
         return ("&%04X" % (pc + self.read_signedbyte(pc + 1) + 2,), '')
@@ -153,9 +164,8 @@ class Dissassemble6502(object):
 
     def disassemble(self, pc):
         opcode = self.read_byte(pc)
-        inst = self.decoder.instruction(opcode)
-        mode = self.decoder.addressingMode(opcode)
-        (params, comment) = self.disassembly_table[mode](pc)
+        (inst, operands) = self.opcode_table[opcode]
+        (params, comment) = operands(pc)
         if comment:
             formatted = "%-8s  ; %s" % (params, comment)
         else:
@@ -167,24 +177,17 @@ class Disassemble6502Pb(Dissassemble6502):
     def __init__(self, pb):
         super(Disassemble6502Pb, self).__init__(pb.dispatch.decoder)
         self.pb = pb
-
-    def read_byte(self, address):
-        return self.pb.memory.readByte(address)
-
-    def read_signedbyte(self, address):
-        b = self.pb.memory.readByte(address)
-        if b & 0x80:
-            b = b - 256
-        return b
-
-    def read_word(self, address):
-        return self.pb.memory.readWord(address)
+        self.regs = pb.regs
+        # The memory accessors are used directly, rather than through methods
+        self.read_byte = pb.memory.readByte
+        self.read_signedbyte = pb.memory.readSignedByte
+        self.read_word = pb.memory.readWord
 
     def reg_x(self):
-        return self.pb.regs.x
+        return self.regs.x
 
     def reg_y(self):
-        return self.pb.regs.y
+        return self.regs.y
 
 
 class PbHook(object):
@@ -206,6 +209,51 @@ class PbHook(object):
         args.append(self.user_data)
         self.callback(self.pb, *args)
 
+    def call_code(self, address, size):
+        self.callback(self.pb, address, size, self.user_data)
+
+    def call_memory(self, access, address, size, value):
+        self.callback(self.pb, access, address, size, value, self.user_data)
+
+
+class PbHookRanges(object):
+    """
+    Hooks ordered by their start address, so that those overlapping a region can be found quickly.
+    """
+
+    def __init__(self):
+        self.starts = []
+        self.hooks = []
+        # The size of the largest hook, which limits how far before a region
+        # an overlapping hook may start.
+        self.longest = 0
+
+    def add(self, hook):
+        index = bisect.bisect_right(self.starts, hook.address)
+        self.starts.insert(index, hook.address)
+        self.hooks.insert(index, hook)
+        self.longest = max(self.longest, hook.size)
+
+    def remove(self, hook):
+        index = self.hooks.index(hook)
+        del self.starts[index]
+        del self.hooks[index]
+        self.longest = max([0] + [hook.size for hook in self.hooks])
+
+    def overlapping(self, address, size):
+        """
+        Find the hooks which overlap a region.
+
+        @param address: Start address of the region
+        @param size:    Size of the region
+
+        @return: list of the hooks overlapping the region, in address order
+        """
+        end = address + size
+        low = bisect.bisect_right(self.starts, address - self.longest)
+        high = bisect.bisect_left(self.starts, end)
+        return [hook for hook in self.hooks[low:high] if hook.end > address]
+
 
 class PbDispatcher(Dispatch.Dispatcher):
     """
@@ -218,109 +266,160 @@ class PbDispatcher(Dispatch.Dispatcher):
 
         # Execution hooks - when we hit an address in the range we call the hook
         self.hook_exec = []
+        # Map of the addresses which have any execution hooks, so that we only need
+        # to search the hooks for those addresses.
+        self.hook_exec_map = bytearray(0x10000)
 
     def hook_add(self, hook):
         self.hook_exec.append(hook)
+        self.hook_update_map(hook)
 
     def hook_del(self, hook):
         self.hook_exec.remove(hook)
+        self.hook_update_map(hook)
 
-    def execute(self, pc, length, opcode, instruction, writeback):
+    def hook_update_map(self, changed):
+        """
+        Update the map of hooked addresses over the range of a hook which has changed.
+        """
+        begin = max(changed.address, 0)
+        end = min(changed.end, 0x10000)
+        if begin >= end:
+            return
+
+        hooked = self.hook_exec_map
+        hooked[begin:end] = bytearray(end - begin)
         for hook in self.hook_exec:
-            if pc in hook:
-                hook.call(pc, length)
-                if pc != self.pb.regs.pc:
-                    # They changed the execution location, so we're not running this instruction any more.
-                    return self.pb.regs.pc
+            hook_begin = max(hook.address, begin)
+            hook_end = min(hook.end, end)
+            if hook_begin < hook_end:
+                hooked[hook_begin:hook_end] = bytearray(b'\x01') * (hook_end - hook_begin)
 
-        if self.pb.executing:
+    def execute(self, pc, length, opcode, instruction, writeback):
+        if self.hook_exec_map[pc]:
+            for hook in self.hook_exec:
+                if hook.address <= pc < hook.end:
+                    hook.call_code(pc, length)
+                    if pc != self.pb.regs.pc:
+                        # They changed the execution location, so we're not running this instruction any more.
+                        return self.pb.regs.pc
+
+        if self.pb.running[0]:
             return super(PbDispatcher, self).execute(pc, length, opcode, instruction, writeback)
 
 
 class PbMemory(Memory.Memory):
+    # How the memory hooks are dispatched
+    HOOK_MODE_NONE = 0      # No hooks present
+    HOOK_MODE_SIMPLE = 1    # Single byte hooks, looked up by address
+    HOOK_MODE_LIST = 2      # Hooks must be searched
 
     def __init__(self, pb):
         super(PbMemory, self).__init__()
         self.pb = pb
         # We keep a list of the registered hooks, which are ordered.
-        # We also keep a list of the hooks keyed by address in the 'hook_simple_*'
-        # dictionary. These will be used if all the hooks that are registered are
+        # We also keep a table of the hooks indexed by address in the 'hook_simple_*'
+        # lists. These will be used if all the hooks that are registered are
         # a single byte long, and none of them use the same address.
-        # This is likely to be the most common case, and using a dictionary
-        # we can avoid a more lengthy lookup by searching a list.
+        # This is likely to be the most common case, and using a table indexed by
+        # address we can avoid a more lengthy lookup by searching a list.
         self.hook_read = []
-        self.hook_simple_read = {}
+        self.hook_simple_read = [None] * 0x10000
         self.hook_write = []
-        self.hook_simple_write = {}
+        self.hook_simple_write = [None] * 0x10000
+        # The hooks are also kept ordered by address, for the accesses to regions of memory.
+        self.hook_read_ranges = PbHookRanges()
+        self.hook_write_ranges = PbHookRanges()
+        # How the hooks should be dispatched, so that the accessors need only check
+        # one value to know that there are no hooks.
+        self.hook_read_mode = self.HOOK_MODE_NONE
+        self.hook_write_mode = self.HOOK_MODE_NONE
 
     def hook_add(self, hook):
+        simple = hook.size == 1 and 0 <= hook.address < 0x10000
         if hook.htype & PbConstants.PB_HOOK_MEM_READ:
-            if not self.hook_read or self.hook_simple_read:
+            if self.hook_read_mode != self.HOOK_MODE_LIST:
                 # This is the first hook, or there are simple hooks present, so we
                 # can apply simple hooks.
-                if hook.size == 1 and not self.hook_simple_read.get(hook.address):
+                if simple and not self.hook_simple_read[hook.address]:
                     # This is a simple hook, and there's no other hook in the address
                     self.hook_simple_read[hook.address] = hook
+                    self.hook_read_mode = self.HOOK_MODE_SIMPLE
                 else:
                     # This is not a simple hook (or another hook at the address exists)
                     # and there exist simple hooks, so clear them. We'll revert to slow
                     # hooks.
-                    self.hook_simple_read = {}
+                    self.hook_simple_read = [None] * 0x10000
+                    self.hook_read_mode = self.HOOK_MODE_LIST
             self.hook_read.append(hook)
+            self.hook_read_ranges.add(hook)
 
         if hook.htype & PbConstants.PB_HOOK_MEM_WRITE:
-            if not self.hook_write or self.hook_simple_write:
+            if self.hook_write_mode != self.HOOK_MODE_LIST:
                 # This is the first hook, or there are simple hooks present, so we
                 # can apply simple hooks.
-                if hook.size == 1 and not self.hook_simple_write.get(hook.address):
+                if simple and not self.hook_simple_write[hook.address]:
                     # This is a simple hook, and there's no other hook in the address
                     self.hook_simple_write[hook.address] = hook
+                    self.hook_write_mode = self.HOOK_MODE_SIMPLE
                 else:
                     # This is not a simple hook (or another hook at the address exists)
                     # and there exist simple hooks, so clear them. We'll revert to slow
                     # hooks.
-                    self.hook_simple_write = {}
+                    self.hook_simple_write = [None] * 0x10000
+                    self.hook_write_mode = self.HOOK_MODE_LIST
             self.hook_write.append(hook)
+            self.hook_write_ranges.add(hook)
 
     def hook_del(self, hook):
         if hook in self.hook_read:
             self.hook_read.remove(hook)
-            if hook.address in self.hook_simple_read:
-                del self.hook_simple_read[hook.address]
+            self.hook_read_ranges.remove(hook)
+            if self.hook_read_mode == self.HOOK_MODE_SIMPLE:
+                # All the hooks are simple, so this one is in the table
+                self.hook_simple_read[hook.address] = None
+            if not self.hook_read:
+                self.hook_read_mode = self.HOOK_MODE_NONE
         if hook in self.hook_write:
             self.hook_write.remove(hook)
-            if hook.address in self.hook_simple_write:
-                del self.hook_simple_write[hook.address]
+            self.hook_write_ranges.remove(hook)
+            if self.hook_write_mode == self.HOOK_MODE_SIMPLE:
+                # All the hooks are simple, so this one is in the table
+                self.hook_simple_write[hook.address] = None
+            if not self.hook_write:
+                self.hook_write_mode = self.HOOK_MODE_NONE
 
     def readByte(self, address, skip_hook=False):
         # Dispatch any hooks for this byte
-        if not skip_hook and self.hook_read:
-            if self.hook_simple_read:
-                hook = self.hook_simple_read.get(address, None)
+        mode = self.hook_read_mode
+        if mode and not skip_hook:
+            if mode == self.HOOK_MODE_SIMPLE:
+                hook = self.hook_simple_read[address]
                 if hook:
-                    hook.call(PbConstants.PB_MEM_READ, address, 1, 0)
+                    hook.call_memory(PbConstants.PB_MEM_READ, address, 1, 0)
             else:
                 # There's no simple hooks present, but there are hooks,
                 # so we need to process them
                 for hook in self.hook_read:
-                    if address in hook:
-                        hook.call(PbConstants.PB_MEM_READ, address, 1, 0)
+                    if hook.address <= address < hook.end:
+                        hook.call_memory(PbConstants.PB_MEM_READ, address, 1, 0)
 
         return super(PbMemory, self).readByte(address)
 
     def writeByte(self, address, value, skip_hook=False):
         # Dispatch any hooks for this byte
-        if not skip_hook and self.hook_write:
-            if self.hook_simple_write:
-                hook = self.hook_simple_write.get(address, None)
+        mode = self.hook_write_mode
+        if mode and not skip_hook:
+            if mode == self.HOOK_MODE_SIMPLE:
+                hook = self.hook_simple_write[address]
                 if hook:
-                    hook.call(PbConstants.PB_MEM_WRITE, address, 1, value)
+                    hook.call_memory(PbConstants.PB_MEM_WRITE, address, 1, value)
             else:
                 # There's no simple hooks present, but there are hooks,
                 # so we need to process them
                 for hook in self.hook_write:
-                    if address in hook:
-                        hook.call(PbConstants.PB_MEM_WRITE, address, 1, value)
+                    if hook.address <= address < hook.end:
+                        hook.call_memory(PbConstants.PB_MEM_WRITE, address, 1, value)
 
         super(PbMemory, self).writeByte(address, value)
 
@@ -330,30 +429,55 @@ class PbMemory(Memory.Memory):
         """
 
         # Dispatch any hooks for this range
-        if not skip_hook:
-            for hook in self.hook_read:
-                if (address, size) in hook:
-                    # Report only the region of the read that is in the hook
-                    bound_address = max(address, min(hook.address, address + size))
-                    bound_end = min(address + size, max(hook.end, address + size))
-                    hook.call(PbConstants.PB_MEM_READ, bound_address, bound_end - bound_address, 0)
+        address &= 0xFFFF
+        if self.hook_read_mode and not skip_hook:
+            end = address + size
+            for hook in self.hook_read_ranges.overlapping(address, size):
+                # Report only the region of the read that is in the hook
+                bound_address = max(address, hook.address)
+                bound_end = min(end, hook.end)
+                hook.call_memory(PbConstants.PB_MEM_READ, bound_address, bound_end - bound_address, 0)
 
         return super(PbMemory, self).readBytes(address, size)
 
+    def getView(self, address, size, skip_hook=False):
+        """
+        Obtain a view of a region of memory, for reading.
+        """
+        address &= 0xFFFF
+        if self.hook_read_mode and not skip_hook:
+            # Read through the hooks so that they see the access
+            return Memory.readOnlyView(self.readBytes(address, size))
+
+        return super(PbMemory, self).getView(address, size)
+
+    def getWritableView(self, address, size, skip_hook=False):
+        """
+        Obtain a writable view of a region of memory.
+
+        @return: memoryview of the region, or None if it cannot be written directly
+        """
+        if self.hook_write_mode and not skip_hook:
+            # Writes must go through the hooks so that they see the access
+            return None
+
+        return super(PbMemory, self).getWritableView(address, size)
+
     def writeBytes(self, address, value, skip_hook=False):
         """
         Read multiple bytes into a bytearray / mapped region.
         """
         # Dispatch any hooks for this range
-        if not skip_hook:
+        address &= 0xFFFF
+        if self.hook_write_mode and not skip_hook:
             size = len(value)
-            for hook in self.hook_write:
-                if (address, size) in hook:
-                    # Report only the region of the write that is in the hook
-                    bound_address = max(address, min(hook.address, address + size))
-                    bound_end = min(address + size, max(hook.end, address + size))
-                    bound_value = value[bound_address - address:bound_end - address]
-                    hook.call(PbConstants.PB_MEM_READ, bound_address, bound_end - bound_address, bound_value)
+            end = address + size
+            for hook in self.hook_write_ranges.overlapping(address, size):
+                # Report only the region of the write that is in the hook
+                bound_address = max(address, hook.address)
+                bound_end = min(end, hook.end)
+                bound_value = value[bound_address - address:bound_end - address]
+                hook.call_memory(PbConstants.PB_MEM_WRITE, bound_address, bound_end - bound_address, bound_value)
 
         super(PbMemory, self).writeBytes(address, value)
 
@@ -408,7 +532,9 @@ class Pb(object):
         from .MOS import MOS
         self.mos = MOS(self)
 
-        self.executing = False
+        # Whether we are executing code, held in a list so that the execution loop
+        # can check it through a local variable.
+        self.running = [False]
 
         def write_pc(v):
             #print("Set PC to &%04x" % (v,))
@@ -441,57 +567,80 @@ class Pb(object):
         def read_y():
             return self.regs.y & 0xFF
 
-        self.reg_dispatch = {
-                PbConstants.PB_6502_REG_PC: (read_pc, write_pc),
-                PbConstants.PB_6502_REG_SP: (read_sp, write_sp),
-                PbConstants.PB_6502_REG_A: (read_a, write_a),
-                PbConstants.PB_6502_REG_X: (read_x, write_x),
-                PbConstants.PB_6502_REG_Y: (read_y, write_y),
-                PbConstants.PB_6502_REG_PS: (lambda: self.regs.ps(), lambda v: self.regs.setPS(v)),
-            }
+        # Register accessors, as (read, write) functions, indexed by the register number
+        reg_dispatch = [None] * (PbConstants.PB_6502_REG_PS + 1)
+        reg_dispatch[PbConstants.PB_6502_REG_PC] = (read_pc, write_pc)
+        reg_dispatch[PbConstants.PB_6502_REG_SP] = (read_sp, write_sp)
+        reg_dispatch[PbConstants.PB_6502_REG_A] = (read_a, write_a)
+        reg_dispatch[PbConstants.PB_6502_REG_X] = (read_x, write_x)
+        reg_dispatch[PbConstants.PB_6502_REG_Y] = (read_y, write_y)
+        reg_dispatch[PbConstants.PB_6502_REG_PS] = (self.regs.ps, self.regs.setPS)
+        self.reg_dispatch = tuple(reg_dispatch)
+
+    @property
+    def executing(self):
+        return self.running[0]
+
+    @executing.setter
+    def executing(self, value):
+        self.running[0] = value
 
     # emulate from @begin, and stop when reaching address @until
     def emu_start(self, begin, until, count=0):
         insts = 0
-        self.executing = True
+        running = self.running
+        running[0] = True
         if begin is not None:
             self.regs.pc = begin
+        # Bind the objects used on every instruction once, outside the loop
+        regs = self.regs
+        tick = self.bbc.tick
         try:
-            while self.executing and self.regs.pc != until:
-                #print "%s: PC: %s" % (insts, hex(self.regs.pc))
+            # The loop is chosen once, so that an unlimited run need not count instructions
+            if count:
+                while running[0] and regs.pc != until and insts < count:
+                    #print "%s: PC: %s" % (insts, hex(regs.pc))
 
-                self.bbc.tick()
-                insts += 1
-                if count and insts >= count:
-                    break
+                    tick()
+                    insts += 1
+            else:
+                while running[0] and regs.pc != until:
+                    tick()
         finally:
-            self.executing = False
+            running[0] = False
 
     # stop emulation
     def emu_stop(self):
-        self.executing = False
+        self.running[0] = False
 
-    # return the value of a register
-    def reg_read(self, reg_id):
-        dispatch = self.reg_dispatch.get(reg_id)
-        if not dispatch:
+    def _reg_accessors(self, reg_id):
+        """
+        Find the functions which read and write a register.
+
+        @param reg_id:  Register number (PB_6502_REG_*)
+
+        @return: Tuple of (read, write) functions for the register
+        """
+        if not isinstance(reg_id, numbers.Integral) or not 0 <= reg_id < len(self.reg_dispatch):
+            raise PbError(PbConstants.PB_ERR_ARG)
+        accessors = self.reg_dispatch[reg_id]
+        if accessors is None:
             raise PbError(PbConstants.PB_ERR_ARG)
+        return accessors
 
-        return dispatch[0]()
+    # return the value of a register
+    def reg_read(self, reg_id):
+        return self._reg_accessors(reg_id)[0]()
 
     # write to a register
     def reg_write(self, reg_id, value):
-        dispatch = self.reg_dispatch.get(reg_id)
-        if not dispatch:
-            raise PbError(PbConstants.PB_ERR_ARG)
-
-        dispatch[1](value)
+        self._reg_accessors(reg_id)[1](value)
 
-    # read data from memory
+    # read data from memory, as a bytearray
     def mem_read(self, address, size):
         return self.memory.readBytes(address, size)
 
-    # write to memory
+    # write to memory, from bytes, a bytearray, or any other buffer
     def mem_write(self, address, data):
         self.memory.writeBytes(address, data)
 
@@ -173,6 +173,18 @@ class OSWRCH(OSInterface):
         """
         return False
 
+    def writebatch(self, data):
+        """
+        Write a sequence of BBC VDU codes to the output stream.
+
+        @param data:    bytes or bytearray of the VDU codes to write, which give
+                        integers when iterated
+
+        @return:    True if all the codes were written,
+                    False if they should be written individually
+        """
+        return False
+
 
 class OSRDCH(OSInterface):
     """
@@ -2,18 +2,48 @@
 Interfaces to the host filesystem.
 """
 
+import collections
 import errno
+import io
 import os
 import stat
 
 from .base import BBCError
 
+# Directory scanning which reports the type of the objects found, without a stat of each
+# object, if it is available (Python 3.5 onwards).
+_scandir = getattr(os, 'scandir', None)
+
 open_in = 0x40
 open_out = 0x80
 open_up = 0xC0
 open_mask = 0xC0
 
 
+# Catalogue information for a file, as returned by FS.fileinfo
+FileInfo = collections.namedtuple('FileInfo', 'type load exec_ length attr')
+
+
+def readinto_all(fh, buf):
+    """
+    Fill a buffer from a file, stopping early only at the end of the file.
+
+    @param fh:      File object to read from
+    @param buf:     Writable buffer to read into
+
+    @return:    Number of bytes read
+    """
+    view = memoryview(buf)
+    size = len(view)
+    total = 0
+    while total < size:
+        got = fh.readinto(view[total:])
+        if not got:
+            break
+        total += got
+    return total
+
+
 class BBCFileNotFoundError(BBCError):
     pass
 
@@ -39,14 +69,16 @@ class DirectoryEntry(object):
     stat_read_mask = stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH
     stat_write_mask = stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH
 
-    def __init__(self, fs, native_name, parent):
+    def __init__(self, fs, native_name, parent, is_dir=None):
         self.fs = fs
         self.native_name = native_name or ''
         self.parent = parent
 
         self.loadaddr = self.default_loadaddr
         self.execaddr = self.default_execaddr
-        self.attributes = self.default_attributes
+        self._attributes = self.default_attributes
+        self._size = None
+        self._info = None
 
         if native_name != '$':
             name = self.fs.decode_from_filesystem(native_name)
@@ -88,27 +120,15 @@ class DirectoryEntry(object):
         if parent is not None:
             self.fullpath_native = os.path.join(parent.fullpath_native, native_name)
 
-            try:
-                st = os.stat(self.fullpath_native)
-            except OSError:
-                self.objtype = 0
-                self.loadaddr = 0
-                self.execaddr = 0
-                self.size = 0
-                self.attributes = 0
+            if is_dir is None:
+                self.read_stat()
             else:
-                self.objtype = 1
-                mode = st.st_mode
-                if stat.S_ISDIR(mode):
-                    self.objtype = 2
-                    self.size = 0
-                else:
-                    self.size = st.st_size
-
-                # Determine attributes
-                self.extract_attributes(st)
+                # The type is already known from the directory scan, so the size
+                # and attributes are only read from the file when they are needed.
+                self.objtype = 2 if is_dir else 1
 
         else:
+            self._size = 0
             # When we don't know the filetype, we leave it set to 0
             if native_name == b'$':
                 # This is the root entry, so fake as a directory
@@ -121,6 +141,51 @@ class DirectoryEntry(object):
                     % (self.name, self.native_name,
                        self.objtype, self.loadaddr, self.execaddr, self.size, self.attributes)
 
+    @property
+    def size(self):
+        if self._size is None:
+            self.read_stat()
+        return self._size
+
+    @property
+    def attributes(self):
+        if self._size is None:
+            self.read_stat()
+        return self._attributes
+
+    def read_stat(self):
+        """
+        Read the type, size and attributes from the native file.
+        """
+        self._size = 0
+        try:
+            st = os.stat(self.fullpath_native)
+        except OSError:
+            self.objtype = 0
+            self.loadaddr = 0
+            self.execaddr = 0
+            self._attributes = 0
+        else:
+            self.objtype = 1
+            if stat.S_ISDIR(st.st_mode):
+                self.objtype = 2
+            else:
+                self._size = st.st_size
+
+            # Determine attributes
+            self.extract_attributes(st)
+
+    @property
+    def info(self):
+        """
+        The catalogue information for this entry, constructed once and then reused.
+        """
+        if self._info is None:
+            # Size is read first, as reading the native file may update the other fields
+            size = self.size
+            self._info = FileInfo(self.objtype, self.loadaddr, self.execaddr, size, self.attributes)
+        return self._info
+
     def extract_attributes(self, st):
         """
         Extract the attributes from the native file.
@@ -136,60 +201,60 @@ class DirectoryEntry(object):
         rval = mode & self.stat_read_mask
         if rval == self.stat_read_mask:
             # Definitely readable
-            self.attributes |= 0x11
+            self._attributes |= 0x11
         elif rval == 0:
             # Definitely not readable
-            self.attributes &= ~0x11
+            self._attributes &= ~0x11
         else:
             # Determine from UID/GID
-            self.attributes &= ~0x11
+            self._attributes &= ~0x11
             #print("R name=%s   uid=%i/%i  mode=%o" % (self.name, st.st_uid, uid, mode))
             if st.st_uid == uid:
                 # We are the user, so check permissions for USR
                 if mode & stat.S_IRUSR:
-                    self.attributes |= 0x1
+                    self._attributes |= 0x1
                 if mode & stat.S_IRGRP or mode & stat.S_IROTH:
-                    self.attributes |= 0x10
+                    self._attributes |= 0x10
 
             elif st.st_gid in self.fs.native_gids:
                 # We are in the group, so check permissions for GRP
                 if mode & stat.S_IRGRP:
-                    self.attributes |= 0x1
+                    self._attributes |= 0x1
                 if mode & stat.S_IROTH:
-                    self.attributes |= 0x10
+                    self._attributes |= 0x10
 
             else:
                 if mode & stat.S_IROTH:
-                    self.attributes |= 0x11
+                    self._attributes |= 0x11
 
         rval = mode & self.stat_write_mask
         if rval == self.stat_write_mask:
             # Definitely writable
-            self.attributes |= 0x22
+            self._attributes |= 0x22
         elif rval == 0:
             # Definitely not writable
-            self.attributes &= ~0x22
+            self._attributes &= ~0x22
         else:
             # Determine from UID/GID
             #print("W name=%s   uid=%i/%i  mode=%o" % (self.name, st.st_uid, uid, mode))
-            self.attributes &= ~0x22
+            self._attributes &= ~0x22
             if st.st_uid == uid:
                 # We are the user, so check permissions for USR
                 if mode & stat.S_IWUSR:
-                    self.attributes |= 0x2
+                    self._attributes |= 0x2
                 if mode & stat.S_IWGRP or mode & stat.S_IWOTH:
-                    self.attributes |= 0x20
+                    self._attributes |= 0x20
 
             elif st.st_gid in self.fs.native_gids:
                 # We are in the group, so check permissions for GRP
                 if mode & stat.S_IWGRP:
-                    self.attributes |= 0x2
+                    self._attributes |= 0x2
                 if mode & stat.S_IWOTH:
-                    self.attributes |= 0x20
+                    self._attributes |= 0x20
 
             else:
                 if mode & stat.S_IWOTH:
-                    self.attributes |= 0x22
+                    self._attributes |= 0x22
 
     def generate_native_filename(self, name=None, loadaddr=None, execaddr=None):
         """
@@ -224,6 +289,8 @@ class Directory(object):
         else:
             self.fullpath_native = self.fs.basedir
         self._files = None
+        self._mtime = None
+        self._longest_name = 0
 
     def __repr__(self):
         if self._files:
@@ -237,9 +304,13 @@ class Directory(object):
 
     @property
     def files(self):
-        if not self._files:
+        if self._files is None:
+            self._mtime = self.modified_time()
             try:
-                filenames = os.listdir(self.fullpath_native)
+                if _scandir:
+                    entries = [(entry.name, entry.is_dir()) for entry in _scandir(self.fullpath_native)]
+                else:
+                    entries = [(filename, None) for filename in os.listdir(self.fullpath_native)]
             except OSError as exc:
                 if exc.errno == errno.ENOENT:
                     # FIXME: Find the error number
@@ -250,14 +321,47 @@ class Directory(object):
                 raise
 
             files = {}
+            longest_name = 0
             #print("Files in %r (%r)" % (self.fullpath, self.fullpath_native))
-            for filename in filenames:
-                dirent = DirectoryEntry(fs=self.fs, native_name=filename, parent=self)
+            for (filename, is_dir) in entries:
+                dirent = DirectoryEntry(fs=self.fs, native_name=filename, parent=self, is_dir=is_dir)
                 files[dirent.name.lower()] = dirent
+                if len(dirent.name) > longest_name:
+                    longest_name = len(dirent.name)
                 #print("  %r" % (dirent,))
             self._files = files
+            self._longest_name = longest_name
         return self._files
 
+    @property
+    def longest_name(self):
+        """
+        Length of the longest name of the files in the directory.
+        """
+        if self._files is None:
+            self.files
+        return self._longest_name
+
+    def modified_time(self):
+        """
+        Read the modification time of the native directory.
+
+        @return:    modification time, or None if it could not be read
+        """
+        try:
+            st = os.stat(self.fullpath_native)
+        except OSError:
+            return None
+        return getattr(st, 'st_mtime_ns', st.st_mtime)
+
+    def validate(self):
+        """
+        Discard the cached files if the directory has been modified since they were read.
+        """
+        if self._files is not None and self.modified_time() != self._mtime:
+            self.invalidate()
+            self.fs.changed()
+
     def invalidate(self):
         self._files = None
 
@@ -276,8 +380,10 @@ class OpenFile(object):
     howmap = {
             open_in: 'rb',
             open_out: 'wb',
-            open_up: 'w+b',
+            open_up: 'r+b',
         }
+    readahead_size = 4096
+    buffer_size = 8192
 
     def __init__(self, fs, dirent, how):
         self.fs = fs
@@ -286,44 +392,106 @@ class OpenFile(object):
         self.how = how & open_mask
         self.openhow = self.howmap[self.how]
 
+        # The read-ahead buffer used by the bget function holds [position, end]
+        # of the unread data, so that it can be discarded by other operations.
+        self.readahead = [0, 0]
+
         #print("OpenFile(dirent=%r, how=%r): openhow=%r" % (dirent, how, self.openhow))
-        self.fh = open(dirent.fullpath_native, self.openhow)
+        # The io module's buffered files are used on both Python 2 and 3, so that
+        # reads and writes on an update handle can be mixed without seeking.
+        self.fh = io.open(dirent.fullpath_native, self.openhow, buffering=self.buffer_size)
+
+        # The position of the underlying file and the extent of the file are tracked
+        # as it is used, so that PTR#, EXT# and EOF# can be answered without seeking.
+        self.fh_ptr = 0
+        self.extent = os.fstat(self.fh.fileno()).st_size
 
     def __repr__(self):
         return "<{}(how={})>".format(self.__class__.__name__, self.openhow)
 
+    def discard_readahead(self):
+        """
+        Discard any data read ahead by the bget function, returning the file
+        pointer to the position the reader has reached.
+        """
+        readahead = self.readahead
+        unread = readahead[1] - readahead[0]
+        if unread:
+            self.fh.seek(-unread, os.SEEK_CUR)
+            self.fh_ptr -= unread
+        readahead[0] = 0
+        readahead[1] = 0
+
+    def bget_function(self, read_into):
+        """
+        Construct a function which reads the next byte from this file.
+
+        The file handle is fixed, so the function keeps its buffer and position
+        to hand, and only calls back to the filesystem when the buffer is empty.
+
+        @param read_into:   function to call as read_into(buffer) to refill the buffer
+
+        @return:    function returning the byte read, or -1 at the end of the file
+        """
+        buf = bytearray(self.readahead_size)
+        readahead = self.readahead
+
+        def bget():
+            pos = readahead[0]
+            if pos == readahead[1]:
+                end = read_into(buf)
+                if not end:
+                    return -1
+                readahead[1] = end
+                pos = 0
+            readahead[0] = pos + 1
+            return buf[pos]
+
+        return bget
+
     def close(self):
+        self.discard_readahead()
         self.fh.close()
         self.fh = None
 
     def ptr(self, ptr=None):
         if ptr is None:
-            return self.fh.tell()
+            # The reader's position is behind the file by any data read ahead
+            readahead = self.readahead
+            return self.fh_ptr - (readahead[1] - readahead[0])
+        self.discard_readahead()
         self.fh.seek(ptr, os.SEEK_SET)
+        self.fh_ptr = ptr
 
     def ext(self):
-        ptr = self.ptr()
-        self.fh.seek(ptr, os.SEEK_END)
-        ext = self.ptr()
-        self.ptr(ptr)
-        return ext
+        return self.extent
 
     def read(self, size):
+        self.discard_readahead()
         data = self.fh.read(size)
+        self.fh_ptr += len(data)
         return data
 
+    def read_into(self, buf):
+        self.discard_readahead()
+        got = self.fh.readinto(buf)
+        if got:
+            self.fh_ptr += got
+        return got
+
     def write(self, data):
+        self.discard_readahead()
         self.fh.write(data)
+        self.fh_ptr += len(data)
+        if self.fh_ptr > self.extent:
+            self.extent = self.fh_ptr
 
     def flush(self):
+        self.discard_readahead()
         self.fh.flush()
 
     def eof(self):
-        ptr = self.ptr()
-        self.fh.seek(ptr, os.SEEK_END)
-        ext = self.ptr()
-        self.ptr(ptr)
-        return ptr == ext
+        return self.ptr() >= self.extent
 
 
 class FS(object):
@@ -348,17 +516,36 @@ class FS(object):
             b'.bbc': (0xFFFF8000, 0xFFFF8000),   # BBC ROM
         }
 
+    fileinfo_cache_size = 256
     open_loadaddr = 0xFFFFFFFF
     open_execaddr = 0xFFFFFFFF
     filehandle_max = 255
+    save_chunk_size = 4096
 
     def __init__(self, basedir="."):
         self.basedir = basedir
         self.cached = {}
         self.filehandles = {}
+        # Functions to read a byte from each readable file handle, keyed by handle
+        self.fast_bget = {}
+
         self._next_filehandle = self.filehandle_max
         self._cwd = b'$'
 
+        # Incremented whenever an operation may have created, removed or renamed
+        # a file, so that callers can tell when cached lookups are stale.
+        self.generation = 0
+
+        # Filenames which are known not to exist, so that repeated probes for
+        # missing files do not need to look them up again. This is shared by
+        # all the interfaces using this filesystem, and is discarded whenever
+        # the filesystem changes.
+        self.negative = set()
+
+        # Recently read file information, keyed by the filename requested, holding
+        # the generation it was read in and the FileInfo, in least recently used order.
+        self.fileinfo_cache = collections.OrderedDict()
+
         try:
             self.native_uid = os.getuid()
             self.native_gids = set(os.getgroups())
@@ -367,6 +554,14 @@ class FS(object):
             self.native_uid = None
             self.native_gids = set([])
 
+    def changed(self):
+        """
+        Record that files may have been created, removed, renamed or had their
+        catalogue information changed.
+        """
+        self.generation += 1
+        self.negative.clear()
+
     def encode_to_filesystem(self, filename):
         """
         Convert from a unicode string to something in the host filesystem.
@@ -492,6 +687,8 @@ class FS(object):
             # FIXME: Find the error number
             raise BBCDirNotFoundError(0, b"'%s' is not a directory" % (dirent.fullpath,))
         self._cwd = dirent.fullpath
+        # Relative names now refer to different files
+        self.changed()
 
     def dirname(self, path):
         parts = self.split(path)
@@ -511,9 +708,12 @@ class FS(object):
         leafname = parts[-1]
         return (dirname, leafname)
 
-    def dir(self, path=None):
+    def dir(self, path=None, validate=False):
         """
         Get the directory object for a given directory.
+
+        @param path:        Directory to find, or None for the current directory
+        @param validate:    True to check that the cached directory is still up to date
         """
         if not path:
             path = self.cwd
@@ -531,6 +731,8 @@ class FS(object):
                 dir = Directory(self, leafname, None)
 
             self.cached[path.lower()] = dir
+        elif validate:
+            dir.validate()
         return dir
 
     def find(self, path):
@@ -586,9 +788,18 @@ class FS(object):
     def filehandle_range(self):
         return (1, self.filehandle_max)
 
-    def ensure_exists(self, path, loadaddr, execaddr):
+    def native_path_for(self, path, loadaddr, execaddr):
         """
-        Ensure a file exists, creating it if needed, renaming if not.
+        Find the native path for a file which should have a given load and exec address.
+
+        If the file exists but its name doesn't match the load and exec addresses, it
+        is renamed.
+
+        @param path:        File to find
+        @param loadaddr:    Load address for the file
+        @param execaddr:    Exec address for the file
+
+        @return:    Tuple of (Directory, native path, True if the file exists)
         """
         path = self.canonicalise(path)
         (dirname, leafname) = self.splitname(path)
@@ -597,43 +808,152 @@ class FS(object):
         try:
             dirent = dir[leafname]
         except BBCFileNotFoundError:
-            # If the file isn't there, we need to create one.
-            #print("Try to create new file for %r : %r / %r" % (path, dirname, leafname))
             native_leafname = self.generate_native_filename(leafname, loadaddr, execaddr, 1)
-            native_path = os.path.join(dir.fullpath_native, native_leafname)
-            #print("Native name = %r" % (native_path,))
-            # Create the file
-            with open(native_path, 'w') as fh:
-                pass
-            dir.invalidate()
-            dirent = dir[leafname]
+            return (dir, os.path.join(dir.fullpath_native, native_leafname), False)
+
+        native_path = dirent.fullpath_native
 
         # Now check that the load and exec are consistent
         if dirent.loadaddr != loadaddr or dirent.execaddr != execaddr:
             # The name of the file in the directory doesn't match, so we need to generate a new name
-            # This should only really happen if the file we want already exists
             native_leafname = self.generate_native_filename(leafname, loadaddr, execaddr, 1)
             if native_leafname != dirent.native_name:
                 native_path = os.path.join(dir.fullpath_native, native_leafname)
                 os.rename(dirent.fullpath_native, native_path)
+                dir.invalidate()
+                self.changed()
+
+        return (dir, native_path, True)
+
+    def ensure_exists(self, path, loadaddr, execaddr):
+        """
+        Ensure a file exists, creating it if needed, renaming if not.
+        """
+        (dir, native_path, exists) = self.native_path_for(path, loadaddr, execaddr)
+        if not exists:
+            # If the file isn't there, we need to create one.
+            #print("Native name = %r" % (native_path,))
+            with open(native_path, 'w') as fh:
+                pass
+            dir.invalidate()
+            self.changed()
 
     def fileinfo(self, filename):
+        """
+        Read the catalogue information for an object.
+
+        Names which are found not to exist are remembered until the filesystem
+        changes, so that repeated lookups of them fail without searching.
+
+        @param filename:    Object to read the information for
+
+        @return:    FileInfo for the object
+        """
+        if filename in self.negative:
+            # FIXME: Find the error number
+            raise BBCFileNotFoundError(0, b"File '%s' not found" % (filename,))
+        cache = self.fileinfo_cache
+        entry = cache.pop(filename, None)
+        if entry is None or entry[0] != self.generation:
+            try:
+                info = self.find(filename).info
+            except BBCFileNotFoundError:
+                self.negative.add(filename)
+                raise
+            if info.type == 0:
+                self.negative.add(filename)
+                # FIXME: Find the error number
+                raise BBCFileNotFoundError(0, b"File '%s' not found" % (filename,))
+            entry = (self.generation, info)
+            if len(cache) >= self.fileinfo_cache_size:
+                cache.popitem(last=False)
+        # Most recently used entries are kept at the end
+        cache[filename] = entry
+        return entry[1]
+
+    def load_all(self, filename):
+        """
+        Read the whole of a file, without allocating a file handle.
+
+        @param filename:    File to read
+
+        @return:    Tuple of (data, FileInfo); data is None if the object is not a file
+        """
         dirent = self.find(filename)
-        info_type = dirent.objtype
-        info_load = dirent.loadaddr
-        info_exec = dirent.execaddr
-        info_length = dirent.size
-        info_attr = dirent.attributes
-        return (info_type, info_load, info_exec, info_length, info_attr)
+        if dirent.objtype != 1:
+            return (None, dirent.info)
+        with open(dirent.fullpath_native, 'rb') as fh:
+            size = os.fstat(fh.fileno()).st_size
+            buf = bytearray(size)
+            size = readinto_all(fh, buf)
+        if size != len(buf):
+            # The file was shorter than expected
+            del buf[size:]
+        return (buf, dirent.info._replace(length=size))
+
+    def load_into(self, filename, buffer_for):
+        """
+        Read a file directly into a buffer, without allocating a file handle.
+
+        @param filename:    File to read
+        @param buffer_for:  Function called with the size of the file, returning a writable
+                            buffer of that size, or None if the data cannot be read directly
+
+        @return:    Tuple of (bytes read, FileInfo), or None if no buffer was given
+        """
+        dirent = self.find(filename)
+        with open(dirent.fullpath_native, 'rb') as fh:
+            # The file may have changed since the catalogue was read, so use its current size
+            size = os.fstat(fh.fileno()).st_size
+            buf = buffer_for(size)
+            if buf is None:
+                return None
+            size = readinto_all(fh, buf)
+        return (size, dirent.info._replace(length=size))
+
+    def save_stream(self, filename, data, loadaddr, execaddr):
+        """
+        Write the whole of a file, without allocating a file handle.
+
+        @param filename:    File to write
+        @param data:        Buffer containing the data to write (such as a memoryview)
+        @param loadaddr:    Load address for the file
+        @param execaddr:    Exec address for the file
+        """
+        # The file is created by writing it, so it only needs renaming if it already exists
+        (dir, native_path, exists) = self.native_path_for(filename, loadaddr, execaddr)
+        with open(native_path, 'wb') as fh:
+            for offset in range(0, len(data), self.save_chunk_size):
+                fh.write(data[offset:offset + self.save_chunk_size])
+
+        # The size of the file has changed, so the catalogue information must be re-read
+        dir.invalidate()
+        self.changed()
 
     def set_fileinfo(self, filename, loadaddr, execaddr, attr):
-        # Check that it exists before we apply the set_fileinfo.
+        self.update_fileinfo(filename, loadaddr=loadaddr, execaddr=execaddr, attr=attr)
+
+    def update_fileinfo(self, filename, loadaddr=None, execaddr=None, attr=None):
+        """
+        Update the catalogue information for an existing file.
+
+        @param filename:    File to update
+        @param loadaddr:    New load address, or None to leave unchanged
+        @param execaddr:    New exec address, or None to leave unchanged
+        @param attr:        New attributes, or None to leave unchanged
+        """
+        # Check that it exists before we apply the update.
         dirent = self.find(filename)
+        if loadaddr is None:
+            loadaddr = dirent.loadaddr
+        if execaddr is None:
+            execaddr = dirent.execaddr
 
-        # Ensure exists will perform any rename that we need to make the file exist with those attributes
-        self.ensure_exists(filename, loadaddr, execaddr)
+        if loadaddr != dirent.loadaddr or execaddr != dirent.execaddr:
+            # Ensure exists will perform any rename that we need to make the file exist with those attributes
+            self.ensure_exists(filename, loadaddr, execaddr)
 
-        if dirent.attributes != attr:
+        if attr is not None and dirent.attributes != attr:
             # FIXME: attributes aren't affected yet
             pass
 
@@ -643,14 +963,29 @@ class FS(object):
             os.unlink(dirent.fullpath_native)
         else:
             os.rmdir(dirent.fullpath_native)
+        dirent.parent.invalidate()
+        self.changed()
 
     def open(self, filename, how):
+        """
+        Open a file, returning a BBC file handle.
+
+        @param filename:    File to open
+        @param how:         Mode to open the file with (open_in, open_out or open_up)
+
+        @return:    file handle
+        """
+        reading = (how & open_mask) == open_in
+        if reading and filename in self.negative:
+            # FIXME: Find the error number
+            raise BBCFileNotFoundError(0, b"File '%s' not found" % (filename,))
         try:
             dirent = self.find(filename)
         except BBCFileNotFoundError as exc:
             #print("Not found (%s), how=%r" % (filename, how))
-            if (how & open_mask) == open_in:
+            if reading:
                 # Reading the file, so the file has to exist.
+                self.negative.add(filename)
                 raise
 
             # Writing, or updating, so we want to create the file first
@@ -660,6 +995,13 @@ class FS(object):
 
         bfh = OpenFile(self, dirent, how)
         self.allocate_filehandle(bfh)
+        if bfh.how != open_in:
+            # The file may be written, so the catalogue information must be re-read
+            dirent.parent.invalidate()
+            self.changed()
+        if bfh.how != open_out:
+            handle = bfh.handle
+            self.fast_bget[handle] = bfh.bget_function(lambda buf: self.read_into(handle, buf))
         return bfh.handle
 
     def close(self, handle):
@@ -669,7 +1011,12 @@ class FS(object):
 
         bfh = self.find_filehandle(handle)
         bfh.close()
+        self.fast_bget.pop(handle, None)
         self.release_filehandle(handle)
+        if bfh.how != open_in:
+            # The file may have been written, so the catalogue information must be re-read
+            bfh.dirent.parent.invalidate()
+            self.changed()
 
     def ptr_write(self, handle, ptr):
         bfh = self.find_filehandle(handle)
@@ -691,6 +1038,10 @@ class FS(object):
         bfh = self.find_filehandle(handle)
         return bfh.read(size)
 
+    def read_into(self, handle, buf):
+        bfh = self.find_filehandle(handle)
+        return bfh.read_into(buf)
+
     def write(self, handle, data):
         bfh = self.find_filehandle(handle)
         return bfh.write(data)
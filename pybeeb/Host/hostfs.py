@@ -3,7 +3,16 @@ Implementations of the OS interfaces which communicate with the host (file syste
 """
 
 from .base import OSInterface, OSFILE, OSFIND, OSBGET, OSBPUT, OSARGS, OSFSC, OSBYTE, OSCLI, BBCError
-from .fsbbc import FS, BBCFileNotFoundError, open_in, open_out
+from .fsbbc import FS, BBCFileNotFoundError
+
+
+# Single byte strings for each byte value, so that BPUT doesn't need to construct them
+_BYTE_TABLE = tuple(bytes(bytearray([b])) for b in range(256))
+
+# Attribute letters for each value of a nibble of the attributes, in the order they are listed
+_ATTR_NIBBLE_TABLE = tuple(''.join(letter for (letter, bit) in (('L', 8), ('E', 4), ('W', 2), ('R', 1))
+                                   if value & bit)
+                           for value in range(16))
 
 
 class OSFILEhost(OSFILE):
@@ -24,10 +33,8 @@ class OSFILEhost(OSFILE):
 
         @return:    True if the call is handled, or False if it's not handled
         """
-        self.fs.ensure_exists(filename, info_load, info_exec)
-        handle = self.fs.open(filename, open_out)
-        data = pb.memory.readBytes(src_address & 0xFFFF, src_length)
-        self.fs.write(handle, data)
+        data = pb.memory.getView(src_address, src_length)
+        self.fs.save_stream(filename, data, info_load, info_exec)
         return True
 
     def write_info(self, filename, info_load, info_exec, info_attr, pb):
@@ -51,8 +58,7 @@ class OSFILEhost(OSFILE):
 
         @return:    True if the call is handled, or False if it's not handled
         """
-        (info_type, _, info_exec, info_length, info_attr) = self.fs.fileinfo(filename)
-        self.fs.set_fileinfo(filename, info_load, info_exec, info_attr)
+        self.fs.update_fileinfo(filename, loadaddr=info_load)
         return True
 
     def write_exec(self, filename, info_exec, pb):
@@ -63,8 +69,7 @@ class OSFILEhost(OSFILE):
 
         @return:    True if the call is handled, or False if it's not handled
         """
-        (info_type, info_load, _, info_length, info_attr) = self.fs.fileinfo(filename)
-        self.fs.set_fileinfo(filename, info_load, info_exec, info_attr)
+        self.fs.update_fileinfo(filename, execaddr=info_exec)
         return True
 
     def write_attr(self, filename, info_attr, pb):
@@ -75,8 +80,7 @@ class OSFILEhost(OSFILE):
 
         @return:    True if the call is handled, or False if it's not handled
         """
-        (info_type, info_load, info_exec, info_length, _) = self.fs.fileinfo(filename)
-        self.fs.set_fileinfo(filename, info_load, info_exec, info_attr)
+        self.fs.update_fileinfo(filename, attr=info_attr)
         return True
 
     def read_info(self, filename, pb):
@@ -90,8 +94,7 @@ class OSFILEhost(OSFILE):
         @return:    None if not handled,
                     Tuple of (info_type, info_load, info_exec, info_length, info_attr) if handled
         """
-        (info_type, info_load, info_exec, info_length, info_attr) = self.fs.fileinfo(filename)
-        return (info_type, info_load, info_exec, info_length, info_attr)
+        return self.fs.fileinfo(filename)
 
     def delete(self, filename, pb):
         """
@@ -111,29 +114,23 @@ class OSFILEhost(OSFILE):
         @return:    None if not handled,
                     Tuple of (info_type, info_load, info_exec, info_length, info_attr) if handled
         """
-        handle = None
-        #print("Load: %r" % (filename,))
-        try:
-            (info_type, info_load, info_exec, info_length, info_attr) = self.fs.fileinfo(filename)
-            if info_type == 0:
-                # FIXME: Error number
-                raise BBCFileNotFoundError(0, b"File '%s' not found" % (filename,))
-            if info_type == 2:
-                # FIXME: Error number
-                raise BBCFileNotFoundError(0, b"'%s' is a directory" % (filename,))
+        info = self.fs.fileinfo(filename)
+        if info.type == 2:
+            # FIXME: Error number
+            raise BBCFileNotFoundError(0, b"'%s' is a directory" % (filename,))
 
-            if load_address is None:
-                load_address = info_load & 0xFFFF
+        if load_address is None:
+            load_address = info.load
 
-            handle = self.fs.open(filename, open_in)
-            size = self.fs.ext_read(handle)
-            data = self.fs.read(handle, size)
-            pb.memory.writeBytes(load_address & 0xFFFF, data)
-        finally:
-            if handle:
-                self.fs.close(handle)
+        # Read straight into memory if we can, otherwise copy it in from a buffer
+        loaded = self.fs.load_into(filename, lambda size: pb.memory.getWritableView(load_address, size))
+        if loaded is not None:
+            info = loaded[1]
+        else:
+            (data, info) = self.fs.load_all(filename)
+            pb.memory.writeBytes(load_address, data)
 
-        return (info_type, info_load, info_exec, info_length, info_attr)
+        return info
 
 
 class OSFINDhost(OSFIND):
@@ -180,6 +177,9 @@ class OSBGEThost(OSBGET):
     def __init__(self, fs):
         super(OSBGEThost, self).__init__()
         self.fs = fs
+        # Bound once, as these are used for every byte read
+        self._fast_bget = fs.fast_bget
+        self._fs_read = fs.read
 
     def osbget(self, fh, pb):
         """
@@ -190,10 +190,16 @@ class OSBGEThost(OSBGET):
 
         @return:    byte read, -1 if at file end, or None if not handled
         """
-        data = self.fs.read(fh, 1)
+        bget = self._fast_bget.get(fh, None)
+        if bget:
+            return bget()
+
+        data = self._fs_read(fh, 1)
         if not data:
             return -1
-        return bytearray(data)[0]
+        b = data[0]
+        # Indexing gives an integer on Python 3, but a single character string on Python 2
+        return b if isinstance(b, int) else ord(b)
 
 
 class OSBPUThost(OSBPUT):
@@ -201,6 +207,8 @@ class OSBPUThost(OSBPUT):
     def __init__(self, fs):
         super(OSBPUThost, self).__init__()
         self.fs = fs
+        # Bound once, as this is used for every byte written
+        self._fs_write = fs.write
 
     def osbput(self, b, fh, pb):
         """
@@ -212,9 +220,7 @@ class OSBPUThost(OSBPUT):
 
         @return:    True if handled, False if not handled.
         """
-        #print("bput %r" % (b,))
-        data = bytes(bytearray([b]))
-        self.fs.write(fh, data)
+        self._fs_write(fh, _BYTE_TABLE[b])
         return True
 
 
@@ -273,17 +279,6 @@ class OSARGShost(OSARGS):
         self.fs.flush(fh)
         return True
 
-    def flush_all_files(self, pb):
-        """
-        Flush all files to storage
-
-        @param fh:      File handle to read
-        @param pb:      Emulator object, containing `regs` and `memory`
-
-        @return:    True if handled, False if not handled
-        """
-        return False
-
     def read_current_filesystem(self, pb):
         """
         Read the current filesystem.
@@ -294,16 +289,6 @@ class OSARGShost(OSARGS):
         """
         return 4    # FS_DFS
 
-    def read_cli_args(self, pb):
-        """
-        Read the CLI arguments.
-
-        @param pb:      Emulator object, containing `regs` and `memory`
-
-        @return:    Address of CLI arguments, or None is not handled
-        """
-        return None
-
 
 class OSFSChost(OSFSC):
 
@@ -318,18 +303,6 @@ class OSFSChost(OSFSC):
         address = pb.regs.x | (pb.regs.y << 8)
         return [pb.regs.a, address, pb]
 
-    def opt(self, x, y, pb):
-        """
-        *OPT X, Y issued
-
-        @param x, y:    Parameters to *Opt
-        @param pb:      Emulator object, containing `regs` and `memory`
-
-        @return:        True if handled,
-                        False if not handled
-        """
-        return False
-
     def eof(self, fh, pb):
         """
         EOF#fh check
@@ -343,42 +316,6 @@ class OSFSChost(OSFSC):
         """
         return self.fs.eof(fh)
 
-    def slash(self, cli, pb):
-        """
-        */<command> issued.
-
-        @param cli:     CLI to execute
-        @param pb:      Emulator object, containing `regs` and `memory`
-
-        @return:        True if handled,
-                        False if not handled
-        """
-        return False
-
-    def ukcommand(self, cli, pb):
-        """
-        Unknown command issued
-
-        @param cli:     Command issued
-        @param pb:      Emulator object, containing `regs` and `memory`
-
-        @return:        True if handled,
-                        False if not handled
-        """
-        return False
-
-    def run(self, run, pb):
-        """
-        *Run issued.
-
-        @param run:     Command to run
-        @param pb:      Emulator object, containing `regs` and `memory`
-
-        @return:        True if handled,
-                        False if not handled
-        """
-        return False
-
     def cat(self, path, pb):
         """
         *Cat issued
@@ -389,67 +326,43 @@ class OSFSChost(OSFSC):
         @return:        True if handled,
                         False if not handled
         """
-        dir = self.fs.dir(path)
+        # The listing should show changes made outside the emulator
+        dir = self.fs.dir(path, validate=True)
         files = dir.files
-        longest_name = max(len(dirent.name) for dirent in files.values())
-        longest_name = max(10, longest_name)
+        # The longest name is found when the directory is read, so we only walk the files once
+        longest_name = max(10, dir.longest_name)
 
-        pb.mos.write("Dir.   %s\n\n" % (dir.fullpath.decode('latin-1'),))
+        # The listing is collected and then written all at once
+        out = ["Dir.   %s\n\n" % (dir.fullpath.decode('latin-1'),)]
 
         ordered = sorted(files.items())
         width = 40
         # FIXME: Make the width configurable (or read from the mode vars?)
         x = 0
+        append = out.append
+        attr_table = _ATTR_NIBBLE_TABLE
         for key, dirent in ordered:
-            text = "%-*s  " % (longest_name, dirent.name.decode('latin-1'))
-            attr = []
-            if dirent.objtype == 2:
-                attr.append('D')
-
-            if dirent.attributes & 8:
-                attr.append('L')
-            if dirent.attributes & 4:
-                attr.append('E')
-            if dirent.attributes & 2:
-                attr.append('W')
-            if dirent.attributes & 1:
-                attr.append('R')
-            attr.append('/')
-            if dirent.attributes & 0x80:
-                attr.append('L')
-            if dirent.attributes & 0x40:
-                attr.append('E')
-            if dirent.attributes & 0x20:
-                attr.append('W')
-            if dirent.attributes & 0x10:
-                attr.append('R')
-
-            text += "%-10s  " % (''.join(attr),)
+            (name, attributes, objtype) = (dirent.name, dirent.attributes, dirent.objtype)
+            attr = "%s%s/%s" % ('D' if objtype == 2 else '',
+                                attr_table[attributes & 15],
+                                attr_table[(attributes >> 4) & 15])
+
+            text = "%-*s  %-10s  " % (longest_name, name.decode('latin-1'), attr)
 
             x += len(text)
             if x > width:
-                pb.mos.write(b'\n')
+                append('\n')
                 x = len(text)
 
-            pb.mos.write(text)
+            append(text)
 
         if x != 0:
-            pb.mos.write(b'\n')
+            out.append('\n')
 
-        pb.mos.write("\n%s files\n" % (len(files),))
+        out.append("\n%s files\n" % (len(files),))
+        pb.mos.write(''.join(out))
         return True
 
-    def fs_starting(self, pb):
-        """
-        New FS is starting.
-
-        @param pb:      Emulator object, containing `regs` and `memory`
-
-        @return:        True if handled,
-                        False if not handled
-        """
-        return False
-
     def get_handle_range(self, pb):
         """
         @param pb:      Emulator object, containing `regs` and `memory`
@@ -459,15 +372,6 @@ class OSFSChost(OSFSC):
         """
         return self.fs.handle_range()
 
-    def star_command(self, pb):
-        """
-        @param pb:      Emulator object, containing `regs` and `memory`
-
-        @return:        True if handled,
-                        False if not handled
-        """
-        return False
-
 
 class OSBYTEhost(OSBYTE):
 
@@ -504,13 +408,15 @@ def host_fs_interfaces(basedir):
     Construct a list of OS interfaces for filesystems, using a host base directory.
     """
     fs = FS(basedir)
-    return [
-            lambda: OSFILEhost(fs),
-            lambda: OSFINDhost(fs),
-            lambda: OSBGEThost(fs),
-            lambda: OSBPUThost(fs),
-            lambda: OSARGShost(fs),
-            lambda: OSFSChost(fs),
-            lambda: OSBYTEhost(fs),
-            lambda: OSCLIhost(fs),
+    # The interfaces are constructed once, sharing the filesystem (and its caches).
+    instances = [
+            OSFILEhost(fs),
+            OSFINDhost(fs),
+            OSBGEThost(fs),
+            OSBPUThost(fs),
+            OSARGShost(fs),
+            OSFSChost(fs),
+            OSBYTEhost(fs),
+            OSCLIhost(fs),
         ]
+    return [lambda interface=interface: interface for interface in instances]
@@ -8,17 +8,22 @@ from .base import OSInterface, OSWRCH, OSRDCHpostbuffer, OSWORD, OSBYTE, InputEO
 from .console import Console
 
 
+# The text written to the terminal for each VDU code
+_TTY_TEXT = tuple('\x08 \x08' if ch == 127 else chr(ch) for ch in range(256))
+
+
 class OSWRCHtty(OSWRCH):
 
     def writec(self, ch):
-        if ch == 127:
-            sys.stdout.write('\x08 \x08')
-        else:
-            sys.stdout.write(chr(ch))
+        sys.stdout.write(_TTY_TEXT[ch])
 
         # Return immediately with an RTS
         return True
 
+    def writebatch(self, data):
+        sys.stdout.write(''.join([_TTY_TEXT[ch] for ch in data]))
+        return True
+
 
 class OSRDCHtty(OSRDCHpostbuffer):
 
@@ -72,18 +77,18 @@ class OSBYTEtty(OSBYTE):
         if ch == b'':
             raise InputEOFError("EOF received from terminal")
 
+        regs = pb.regs
         if ch is not None:
             # If a character is detected, X=ASCII value of key pressed, Y=0 and C=0.
-            pb.regs.x = ord(ch)
-            pb.regs.y = 0
-            pb.regs.carry = False
+            # If Escape is pressed then Y=&1B (27) and C=1.
+            code = ord(ch)
+            regs.x = code
+            regs.y = 0
+            regs.carry = (code == 27)
         else:
             # If a character is not detected within timeout then Y=&FF and C=1.
-            pb.regs.y = 0xff
-            pb.regs.carry = False
-        if ch == b'\x1b':
-            # If Escape is pressed then Y=&1B (27) and C=1.
-            pb.regs.carry = True
+            regs.y = 0xff
+            regs.carry = False
 
         return True
 
@@ -11,6 +11,9 @@ try:
 except:
     unicode = str
 
+# Whether iterating over bytes gives integers (Python 3), rather than characters (Python 2)
+_bytes_are_ints = isinstance(b'\0'[0], int)
+
 
 class ExecutionComplete(Exception):
     pass
@@ -22,6 +25,17 @@ class MOS(object):
     def __init__(self, pb):
         self.pb = pb
 
+        # The Python OSWRCH interface, if one has been registered, which output can be
+        # sent to directly whilst the vector still points at its code.
+        self.oswrch_interface = None
+
+        # Number of calls currently in progress, and a hook so that we can exit cleanly
+        # from them. The hook is only installed once, as it is never removed.
+        self.call_depth = 0
+        self.pb.hook_add(PbConstants.PB_HOOK_CODE,
+                         self._execution_complete,
+                         begin=self.return_address, end=self.return_address + 1)
+
     def push_byte(self, value):
         self.pb.memory.writeByte(self.pb.regs.sp + 0x100, value)
         self.pb.regs.sp -= 1
@@ -36,13 +50,31 @@ class MOS(object):
         return self.pb.memory.readByte(self.pb.regs.sp + 0x100)
 
     def push_word(self, value):
-        self.push_byte(value >> 8)
-        self.push_byte(value & 0xff)
+        regs = self.pb.regs
+        sp = regs.sp
+        if sp < 1:
+            # There isn't room for the whole word, so push the bytes to report the overflow
+            self.push_byte(value >> 8)
+            self.push_byte(value & 0xff)
+            return
+
+        # The high byte is pushed first, so the word is stored little endian below it
+        self.pb.memory.writeWord(sp + 0xFF, value)
+        regs.sp = sp - 2
+        if regs.sp < 0x00:
+            raise StackOverflowException()
 
     def pull_word(self):
-        lw = self.pull_byte()
-        hw = self.pull_byte() << 8
-        return lw + hw
+        regs = self.pb.regs
+        sp = regs.sp
+        if sp > 0xFD:
+            # There isn't a whole word on the stack, so pull the bytes to report the underflow
+            lw = self.pull_byte()
+            hw = self.pull_byte() << 8
+            return lw + hw
+
+        regs.sp = sp + 2
+        return self.pb.memory.readWord(sp + 0x101)
 
     def push_pc(self):
         self.push_word(self.pb.regs.pc)
@@ -51,8 +83,9 @@ class MOS(object):
         self.pb.regs.pc = self.pull_word()
     rts = pop_pc
 
-    def _execution_complete(self):
-        raise ExecutionComplete("Return from internal call (abnormal)")
+    def _execution_complete(self, pb, address, size, user_data):
+        if self.call_depth:
+            raise ExecutionComplete("Return from internal call (abnormal)")
 
     def call(self, address, a=None, x=None, y=None, preserve_state=True):
         """
@@ -62,7 +95,7 @@ class MOS(object):
         @param a, x, y:     Register values to use, or None to not set them
         @param preserve_state:  True to preserve all the calling registers
         """
-        old_regs = self.pb.regs.copy()
+        old_regs = self.pb.regs.copy() if preserve_state else None
         self.push_pc()
         self.push_word(self.return_address - 1)
         was_executing = self.pb.executing
@@ -74,11 +107,7 @@ class MOS(object):
         if y is not None:
             self.pb.regs.y = y
 
-        # Add a hook so that we can exit cleanly
-        self.pb.hook_add(PbConstants.PB_HOOK_CODE,
-                         self._execution_complete,
-                         begin=self.return_address, end=self.return_address + 1)
-
+        self.call_depth += 1
         try:
             self.pb.emu_start(address, until=self.return_address)
         except ExecutionComplete:
@@ -87,12 +116,15 @@ class MOS(object):
             # called emu_start and then exited via our hook. This probably means an unbalanced
             # stack. For now we just let this be an exception.
             raise
+        finally:
+            self.call_depth -= 1
 
         self.pop_pc()
         regs = self.pb.regs
         if preserve_state:
-            regs = self.pb.regs.copy()
-            self.pb.regs.restore(old_regs)
+            # Put the original registers back, leaving the saved copy holding the results
+            regs.exchange(old_regs)
+            regs = old_regs
 
         self.pb.executing = was_executing
         return regs
@@ -103,27 +135,75 @@ class MOS(object):
     def osasci(self, c):
         self.call(0xFFE3, a=c, preserve_state=True)
 
-    def write(self, msg):
-        if isinstance(msg, bytes):
-            data = bytearray(msg)
-        elif isinstance(msg, (str, unicode)):
-            # Let's use latin-1 as our encoding for now.
-            data = msg.encode('latin-1')
-            data = bytearray(data)
-        elif isinstance(msg, bytearray):
-            data = msg
+    def direct_interface(self):
+        """
+        Find the OSWRCH interface which characters can be written to directly.
+
+        @return:    registered OSWRCH interface, or None if output must go through
+                    the emulated system
+        """
+        interface = self.oswrch_interface
+        if interface is None:
+            return None
+        if self.pb.memory.readWord(interface.vector) != interface.code:
+            # The vector has been redirected, so the output must go through the system
+            return None
+        return interface
+
+    def write_direct(self, interface, data):
+        """
+        Write characters directly to an OSWRCH interface.
+
+        @param interface:   OSWRCH interface to write to
+        @param data:        bytes or bytearray of the characters to write
+        """
+        if interface.writebatch(data):
+            return
+
+        writec = interface.writec
+        oswrch = self.oswrch
         for c in data:
-            self.osasci(c)
+            if not writec(c):
+                oswrch(c)
 
-    def writeraw(self, msg):
-        if isinstance(msg, bytes):
-            data = bytearray(msg)
-        elif isinstance(msg, (str, unicode)):
+    def codes(self, msg):
+        """
+        Convert a message into the character codes to write.
+
+        @param msg:     bytes, bytearray or string to write
+
+        @return:    bytes or bytearray, which give integer codes when iterated
+        """
+        if isinstance(msg, bytearray):
+            return msg
+        if isinstance(msg, (str, unicode)) and not isinstance(msg, bytes):
             # Let's use latin-1 as our encoding for now.
-            data = msg.encode('latin-1')
-            data = bytearray(data)
-        elif isinstance(msg, bytearray):
-            data = msg
+            msg = msg.encode('latin-1')
+        if _bytes_are_ints:
+            return msg
+        return bytearray(msg)
 
-        for c in data:
-            self.oswrch(c)
+    def write(self, msg):
+        data = self.codes(msg)
+
+        interface = self.direct_interface()
+        if interface is None:
+            osasci = self.osasci
+            for c in data:
+                osasci(c)
+            return
+
+        # OSASCI writes a carriage return as a newline (LF, CR)
+        self.write_direct(interface, data.replace(b'\r', b'\n\r'))
+
+    def writeraw(self, msg):
+        data = self.codes(msg)
+
+        interface = self.direct_interface()
+        if interface is None:
+            oswrch = self.oswrch
+            for c in data:
+                oswrch(c)
+            return
+
+        self.write_direct(interface, data)